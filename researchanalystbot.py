@@ -3,12 +3,15 @@ import streamlit as st
 from pathlib import Path
 import os
 import pandas as pd
+import numpy as np
 import io
+import re
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 from agno.agent import Agent
 from agno.models.groq import Groq
-from agno.team.team import Team
 from agno.tools.arxiv import ArxivTools
 from agno.tools.googlesearch import GoogleSearchTools
 from agno.tools.pandas import PandasTools
@@ -21,113 +24,326 @@ os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
 arxiv_download_dir = Path(__file__).parent / "tmp"
 arxiv_download_dir.mkdir(parents=True, exist_ok=True)
 
-# --- Define Agents ---
-News_Analyst = Agent(
-    name="News Analyst",
-    role="Find recent news on sustainability initiatives",
-    model=Groq(id="qwen/qwen3-32b"),
-    tools=[GoogleSearchTools()],
-    instructions="Search for city-level green projects in the past year",
-    show_tool_calls=True,
-    markdown=True,
-)
+# --- Shared stateless resources (one Groq client/connection pool and one set of tools per process) ---
+MODEL_ID = "qwen/qwen3-32b"
 
-Data_Analyst = Agent(
-    name="Data Analyst",
-    role="Analyze uploaded CSV datasets using comprehensive data analysis",
-    model=Groq(id="qwen/qwen3-32b"),
-    tools=[],
-    instructions="""Analyze uploaded CSV data using the provided dataset context.
-    
-    When analyzing data:
-    1. Use the comprehensive dataset information provided in the context
-    2. Provide detailed statistical analysis and insights
-    3. Identify trends, patterns, and correlations in the data
-    4. Detect anomalies, outliers, and data quality issues
-    5. Suggest actionable recommendations based on findings
-    6. Use markdown formatting for clear presentation with tables and lists
-    
-    Focus on providing thorough data analysis with practical insights and recommendations.""",
-    show_tool_calls=True,
-    markdown=True,
-)
 
-Policy_Reviewer = Agent(
-    name="Policy Reviewer",
-    role="Summarize government policies",
-    model=Groq(id="qwen/qwen3-32b"),
-    tools=[GoogleSearchTools()],
-    instructions="Search official sites for city policy updates",
-    show_tool_calls=True,
-    markdown=True,
-)
+@st.cache_resource
+def get_model():
+    """Groq model shared by all agents"""
+    return Groq(id=MODEL_ID)
 
-Innovations_Scout = Agent(
-    name="Innovations Scout",
-    role="Find innovative green tech ideas",
-    model=Groq(id="qwen/qwen3-32b"),
-    tools=[GoogleSearchTools(), HackerNewsTools()],
-    instructions="Search for “urban sustainability tech”",
-    show_tool_calls=True,
-    markdown=True,
-)
 
-# --- Team Agent (All working together) ---
-discussion_team = Team(
-    name="Discussion Team",
-    mode="collaborate",
-    model=Groq(id="qwen/qwen3-32b"),
-    members=[News_Analyst, Data_Analyst, Policy_Reviewer, Innovations_Scout],
-    instructions=["You are a discussion master. Stop when consensus is reached."],
-    show_tool_calls=True,
-    markdown=True,
-)
+@st.cache_resource
+def get_google_search():
+    """Google search toolkit shared by the search agents"""
+    return GoogleSearchTools()
+
+
+@st.cache_resource
+def get_hackernews():
+    """HackerNews toolkit shared by the search agents"""
+    return HackerNewsTools()
+
+
+# --- Define Agents (agents keep per-run state and memory, so each browser session builds its own) ---
+def build_news_analyst():
+    """News Analyst agent"""
+    return Agent(
+        name="News Analyst",
+        role="Find recent news on sustainability initiatives",
+        model=get_model(),
+        tools=[get_google_search()],
+        instructions="Search for city-level green projects in the past year",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+def build_data_analyst():
+    """Data Analyst agent"""
+    return Agent(
+        name="Data Analyst",
+        role="Analyze uploaded CSV datasets using comprehensive data analysis",
+        model=get_model(),
+        tools=[],
+        instructions="""Analyze uploaded CSV data using the provided dataset context.
+        
+        When analyzing data:
+        1. Use the comprehensive dataset information provided in the context
+        2. Provide detailed statistical analysis and insights
+        3. Identify trends, patterns, and correlations in the data
+        4. Detect anomalies, outliers, and data quality issues
+        5. Suggest actionable recommendations based on findings
+        6. Use markdown formatting for clear presentation with tables and lists
+        
+        Focus on providing thorough data analysis with practical insights and recommendations.""",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+def build_policy_reviewer():
+    """Policy Reviewer agent"""
+    return Agent(
+        name="Policy Reviewer",
+        role="Summarize government policies",
+        model=get_model(),
+        tools=[get_google_search()],
+        instructions="Search official sites for city policy updates",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+def build_innovations_scout():
+    """Innovations Scout agent"""
+    return Agent(
+        name="Innovations Scout",
+        role="Find innovative green tech ideas",
+        model=get_model(),
+        tools=[get_google_search(), get_hackernews()],
+        instructions="Search for “urban sustainability tech”",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+# --- Team (All working together): members fan out in parallel, the moderator merges their findings ---
+TEAM_CHOICE = "All Agents (Team)"
+TEAM_MEMBERS = ("News Analyst", "Data Analyst", "Policy Reviewer", "Innovations Scout")
+
+
+def build_discussion_moderator():
+    """Discussion moderator that aggregates the team members' answers"""
+    return Agent(
+        name="Discussion Team",
+        role="Lead the discussion between the team members",
+        model=get_model(),
+        tools=[],
+        instructions=[
+            "You are a discussion master. You receive each team member's findings on the topic.",
+            "Compare them, resolve disagreements and stop when consensus is reached.",
+        ],
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+def _run_member(member, topic):
+    """Run one team member, returning the exception instead of raising it so the other members still count"""
+    try:
+        return member.run(topic)
+    except Exception as e:
+        return e
+
+
+def run_team_parallel(members, moderator, topic):
+    """Run every team member on the topic concurrently, then stream the moderator's combined answer"""
+    with ThreadPoolExecutor(max_workers=len(members)) as executor:
+        member_results = list(executor.map(lambda member: _run_member(member, topic), members))
+
+    member_findings = []
+    missing = []
+    errors = []
+    for member, result in zip(members, member_results):
+        if isinstance(result, Exception):
+            errors.append(result)
+            missing.append(member.name)
+            st.warning(f"⚠️ {member.name} failed and is left out of the discussion: {result}")
+        elif result and getattr(result, "content", None):
+            member_findings.append(f"## {member.name}\n{result.content}")
+        else:
+            missing.append(member.name)
+            st.warning(f"⚠️ {member.name} returned no findings and is left out of the discussion.")
+
+    # With no findings at all there is nothing to discuss, whether the members failed or came back empty
+    if not member_findings:
+        if errors:
+            raise errors[0]
+        raise RuntimeError("No team member returned any findings.")
+
+    findings = "\n\n".join(member_findings)
+    missing_note = ""
+    if missing:
+        missing_note = (
+            f"\nThese members could not contribute: {', '.join(missing)}. "
+            "Say so in your answer and do not present it as a consensus of the full team.\n"
+        )
+    return moderator.run(f"""
+Discussion topic: {topic}
+
+# Team member findings
+{findings}
+{missing_note}
+Discuss these findings and give the consensus answer to the topic.
+""", stream=True)
+
+
+# --- Agent dispatch table (sidebar label -> builder) ---
+AGENTS = {
+    "News Analyst": build_news_analyst,
+    "Data Analyst": build_data_analyst,
+    "Policy Reviewer": build_policy_reviewer,
+    "Innovations Scout": build_innovations_scout,
+    TEAM_CHOICE: build_discussion_moderator,
+}
+
+
+def get_agent(name):
+    """Return this session's agent, building it on first use"""
+    agents = st.session_state.setdefault("agents", {})
+    if name not in agents:
+        agents[name] = AGENTS[name]()
+    return agents[name]
+
 
 # --- Helper Functions for Data Analysis ---
-def create_data_analysis_context(df, topic):
-    """Create a comprehensive data analysis context"""
+def read_csv(source, **kwargs):
+    """Read a CSV with the C engine into Arrow-backed columns, falling back to NumPy dtypes without pyarrow"""
+    # The preview and the full parse both go through here, so they accept the same files and share header names
+    source.seek(0)
+    try:
+        return pd.read_csv(source, encoding='utf-8', dtype_backend="pyarrow", **kwargs)
+    except ImportError:
+        source.seek(0)
+        return pd.read_csv(source, encoding='utf-8', **kwargs)
+
+
+CORRELATION_TOP_K = 20
+
+
+def _to_soa(numeric):
+    """Numeric columns as a contiguous float64 array with columns as rows (SoA), NaN for missing values"""
+    return np.ascontiguousarray(numeric.to_numpy(dtype=np.float64, na_value=np.nan).T)
+
+
+def _column_stats(X, valid):
+    """Per-column count/mean/std/min/max as a (5, n_columns) array from the SoA float64 copy"""
+    count = valid.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(valid, X, 0.0).sum(axis=1) / count
+        centred = np.where(valid, X - mean[:, None], 0.0)
+        std = np.sqrt((centred * centred).sum(axis=1) / (count - 1))
+    # initial=NaN is neutral for fmin/fmax and keeps a header-only CSV (zero rows) from raising
+    col_min = np.fmin.reduce(X, axis=1, initial=np.nan)
+    col_max = np.fmax.reduce(X, axis=1, initial=np.nan)
+    return np.vstack([count, mean, std, col_min, col_max])
+
+
+def _numeric_summary(df, top_k=CORRELATION_TOP_K):
+    """Compute count/mean/std/min/max of all numeric columns, plus the medians and Pearson correlation of the top_k by variance"""
+    numeric = df.select_dtypes(include=['number'])
+    columns = numeric.columns
+
+    # Columns as rows (SoA) so every per-column reduction streams contiguous memory
+    X = _to_soa(numeric)
+    count, mean, std, col_min, col_max = _column_stats(X, ~np.isnan(X))
+
+    # Only the top_k highest-variance columns are correlated, bounding the work at O(top_k² · rows)
+    top = np.sort(np.argsort(np.nan_to_num(std, nan=-1.0))[::-1][:top_k])
+    X = X[top]
+    valid = ~np.isnan(X)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Centre on the column mean (NaN -> 0) so the cross products stay numerically stable
+        Z = np.where(valid, X - mean[top, None], 0.0)
+        M = valid.astype(np.float64)
+
+        # Pairwise-complete cross products, matching pandas' corr() handling of missing values:
+        # n[i, j] rows where both columns are present, s[i, j] sum of column i over those rows
+        n = M @ M.T
+        s = Z @ M.T
+        ss = (Z * Z) @ M.T
+        sxy = Z @ Z.T
+
+        cov = sxy - s * s.T / n
+        var_i = np.maximum(ss - s * s / n, 0.0)
+        corr = cov / np.sqrt(var_i * var_i.T)
+
+    # Unlike describe(), quantiles are not taken for every column: only the top_k columns get a median
+    medians = pd.Series(
+        [np.median(X[j][valid[j]]) if count[i] else np.nan for j, i in enumerate(top)],
+        index=columns[top],
+        name='median',
+    )
+
+    stats = pd.DataFrame(
+        {
+            'count': count,
+            'mean': mean,
+            'std': std,
+            'min': col_min,
+            'max': col_max,
+        },
+        index=columns,
+    )
+    corr_columns = columns[top]
+    corr_matrix = pd.DataFrame(np.clip(corr, -1.0, 1.0), index=corr_columns, columns=corr_columns).round(3)
+    return stats, medians, corr_matrix
+
+
+def build_df_context(df, columns):
+    """Create the dataset part of the analysis context (overview, statistics, sample, correlations)"""
     try:
-        # Basic statistics
-        stats = df.describe()
+        # Basic statistics and correlations of the numerical columns
+        stats, medians, corr_matrix = _numeric_summary(df)
+        numeric_count = len(stats)
+        
+        # Sections are written straight into one buffer instead of separate intermediate strings
+        buf = io.StringIO()
         
-        # Data shape and info
-        shape_info = f"Dataset shape: {df.shape[0]} rows, {df.shape[1]} columns"
+        # Data shape, columns and data types
+        buf.write("\n## Dataset Overview\n")
+        buf.write(f"Dataset shape: {df.shape[0]} rows, {df.shape[1]} columns\n")
+        buf.write(f"Columns: {', '.join(columns)}\n")
+        buf.write(f"Data types: {df.dtypes.to_dict()}\n")
         
-        # Column information
-        columns_info = f"Columns: {', '.join(df.columns.tolist())}"
+        # Missing values (derived from the non-null count, no boolean mask of the whole frame)
+        buf.write(f"Missing values: {(len(df) - df.count()).to_dict()}\n")
         
-        # Data types
-        dtypes_info = f"Data types: {dict(df.dtypes)}"
+        # Statistical summary (very long summaries are cut to the first 40 numeric columns)
+        buf.write("\n## Statistical Summary")
+        if numeric_count > 40:
+            buf.write(f" (first 40 of {numeric_count} numeric columns)")
+        buf.write("\n")
+        buf.write(stats.head(40).round(4).to_markdown())
         
-        # Missing values
-        missing_info = f"Missing values: {df.isnull().sum().to_dict()}"
+        # Medians, only computed for the highest-variance columns
+        if len(medians):
+            buf.write("\n\n## Medians")
+            if numeric_count > len(medians):
+                buf.write(f" (Top-{len(medians)} by variance)")
+            buf.write("\n")
+            buf.write(medians.round(4).to_frame().to_markdown())
         
-        # Sample data
-        sample_data = df.head(10).to_string()
+        # Sample data (markdown needs no column-width pass; very wide frames are cut to the first 40 columns)
+        sample_df = df.iloc[:, :40] if df.shape[1] > 40 else df
+        buf.write("\n\n## Sample Data (First 10 rows")
+        if df.shape[1] > 40:
+            buf.write(f", first 40 of {df.shape[1]} columns")
+        buf.write(")\n")
+        buf.write(sample_df.head(10).to_markdown(index=False))
         
         # Correlation matrix for numerical columns
-        numerical_cols = df.select_dtypes(include=['number']).columns
-        if len(numerical_cols) > 1:
-            corr_matrix = df[numerical_cols].corr().to_string()
-            correlation_info = f"\n## Correlation Matrix\n{corr_matrix}"
+        buf.write("\n\n## Correlation Matrix")
+        if len(corr_matrix.columns) > 1:
+            if numeric_count > len(corr_matrix.columns):
+                buf.write(f" (Top-{len(corr_matrix.columns)} by variance)")
+            buf.write("\n")
+            buf.write(corr_matrix.to_markdown())
         else:
-            correlation_info = "\n## Correlation Matrix\nNot enough numerical columns for correlation analysis."
+            buf.write("\nNot enough numerical columns for correlation analysis.")
+        buf.write("\n")
         
-        # Create comprehensive context
-        context = f"""
-## Dataset Overview
-{shape_info}
-{columns_info}
-{dtypes_info}
-{missing_info}
-
-## Statistical Summary
-{stats.to_string()}
+        return buf.getvalue()
+    except Exception as e:
+        return f"Error analyzing data: {str(e)}"
 
-## Sample Data (First 10 rows)
-{sample_data}
-{correlation_info}
 
+def create_data_analysis_context(df_context, topic):
+    """Create a comprehensive data analysis context by appending the user's request to the dataset context"""
+    return f"""{df_context}
 ## Analysis Request
 User wants to analyze: {topic}
 
@@ -138,11 +354,126 @@ Please provide comprehensive insights based on this data including:
 - Anomalies or outliers
 - Actionable recommendations
 """
-        return context
-    except Exception as e:
-        return f"Error analyzing data: {str(e)}"
 
 
+@st.cache_data(show_spinner=False)
+def _df_context(_file, file_digest, _columns):
+    """Fully parse the uploaded CSV and build its dataset context, cached on the file's SHA-256 only"""
+    return build_df_context(read_csv(_file), _columns)
+
+
+# --- Semantic cache for agent answers ---
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedder():
+    """Sentence embedding model used to match near-duplicate topics, or None when it cannot be loaded"""
+    # Imported here so torch is only loaded when the cache is first used, never at app startup
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(EMBEDDING_MODEL)
+    except Exception:
+        return None
+
+
+class SemanticCache:
+    """Agent answers stored by normalized topic embedding, matched by cosine similarity"""
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD):
+        self.threshold = threshold
+        self.embeddings = None
+        self.contents = []
+
+    def lookup(self, embedding):
+        """Return the stored answer for the most similar topic, or None below the threshold"""
+        if self.embeddings is None:
+            return None
+        scores = self.embeddings @ embedding
+        best = int(np.argmax(scores))
+        return self.contents[best] if scores[best] >= self.threshold else None
+
+    def add(self, embedding, content):
+        """Store an answer under its topic embedding"""
+        row = embedding[np.newaxis, :]
+        self.embeddings = row if self.embeddings is None else np.vstack([self.embeddings, row])
+        self.contents.append(content)
+
+
+def stream_content(response):
+    """Yield the text of an agent response, chunk by chunk when the agent streamed it"""
+    if hasattr(response, "content"):
+        # Blocking run: the whole answer arrives at once
+        if response.content:
+            yield response.content
+        return
+
+    for chunk in response:
+        content = getattr(chunk, "content", None)
+        if isinstance(content, str) and content:
+            yield content
+
+
+def run_agent_cached(agent, prompt, topic, cache_scope, members=()):
+    """Stream an agent's answer, reusing a stored answer for the same prompt or a near-duplicate topic in the same scope"""
+    cache = st.session_state.setdefault("llm_cache", {})
+    key = hashlib.sha256(f"{agent.name}|{agent.model.id}|{prompt}".encode("utf-8")).hexdigest()
+    if key in cache:
+        yield cache[key]
+        return
+
+    # Without an embedder the semantic cache is skipped and the agent is called directly
+    embedder = get_embedder()
+    if embedder is not None:
+        semantic_cache = st.session_state.setdefault("semantic_cache", {}).setdefault(cache_scope, SemanticCache())
+        embedding = embedder.encode(topic, normalize_embeddings=True).astype(np.float32)
+        content = semantic_cache.lookup(embedding)
+        if content is not None:
+            yield content
+            return
+
+    # The team's members are independent, so they are fanned out in parallel instead of one after another
+    if members:
+        response = run_team_parallel(members, agent, prompt)
+    else:
+        response = agent.run(prompt, stream=True)
+
+    chunks = []
+    for chunk in stream_content(response):
+        chunks.append(chunk)
+        yield chunk
+
+    content = "".join(chunks)
+    if content:
+        cache[key] = content
+        if embedder is not None:
+            semantic_cache.add(embedding, content)
+
+
+@st.cache_data(show_spinner=False)
+def sample_csv_bytes():
+    """Serialize the sample air quality dataset once instead of on every rerun"""
+    return pd.DataFrame({
+        'Date': ['2025-01-01', '2025-01-02', '2025-01-03', '2025-01-01', '2025-01-02', '2025-01-03'],
+        'City': ['New York', 'New York', 'New York', 'Los Angeles', 'Los Angeles', 'Los Angeles'],
+        'PM2.5': [12.5, 15.2, 18.7, 8.9, 11.3, 14.6],
+        'PM10': [25.3, 28.7, 32.1, 18.5, 21.2, 24.8],
+        'NO2': [45.2, 48.9, 52.4, 38.7, 41.5, 44.9],
+        'O3': [32.1, 35.6, 38.2, 42.3, 45.8, 48.1],
+        'Temperature': [15.5, 12.3, 10.1, 22.1, 20.8, 19.2],
+        'Humidity': [65, 70, 75, 45, 50, 55]
+    }).to_csv(index=False).encode("utf-8")
+
+
+# --- Error tips (one precompiled, case-insensitive matcher for all known errors) ---
+ERROR_TIPS = {
+    "tool call validation failed": "💡 Tip: This might be a tool configuration issue. Try using a different agent.",
+    "rate limit": "💡 Tip: Rate limit reached. Please wait a moment and try again.",
+}
+ERROR_TIP_PATTERN = re.compile(f"({'|'.join(map(re.escape, ERROR_TIPS))})", re.IGNORECASE)
+
 
 # --- Streamlit UI ---
 st.set_page_config(page_title="Multi-Agent Research Tool", page_icon="🤖")
@@ -152,20 +483,11 @@ st.title("🤖 Multi-Agent Research Discussion Tool")
 st.sidebar.header("Agent Selection")
 agent_choice = st.sidebar.radio(
     "Choose which agent to use:",
-    ("News Analyst", "Data Analyst", "Policy Reviewer", "Innovations Scout", "All Agents (Team)")
+    tuple(AGENTS)
 )
 
 # Map user choice to the actual agent
-if agent_choice == "News Analyst":
-    selected_agent = News_Analyst
-elif agent_choice == "Data Analyst":
-    selected_agent = Data_Analyst
-elif agent_choice == "Policy Reviewer":
-    selected_agent = Policy_Reviewer
-elif agent_choice == "Innovations Scout":
-    selected_agent = Innovations_Scout
-else:
-    selected_agent = discussion_team
+selected_agent = get_agent(agent_choice)
 
 # CSV Upload for Data Analysis
 uploaded_file = None
@@ -173,21 +495,9 @@ if agent_choice == "Data Analyst":
     st.header("📊 Data Upload")
     
     # Sample data download option
-    sample_data = pd.DataFrame({
-        'Date': ['2025-01-01', '2025-01-02', '2025-01-03', '2025-01-01', '2025-01-02', '2025-01-03'],
-        'City': ['New York', 'New York', 'New York', 'Los Angeles', 'Los Angeles', 'Los Angeles'],
-        'PM2.5': [12.5, 15.2, 18.7, 8.9, 11.3, 14.6],
-        'PM10': [25.3, 28.7, 32.1, 18.5, 21.2, 24.8],
-        'NO2': [45.2, 48.9, 52.4, 38.7, 41.5, 44.9],
-        'O3': [32.1, 35.6, 38.2, 42.3, 45.8, 48.1],
-        'Temperature': [15.5, 12.3, 10.1, 22.1, 20.8, 19.2],
-        'Humidity': [65, 70, 75, 45, 50, 55]
-    })
-    
-    csv_sample = sample_data.to_csv(index=False)
     st.download_button(
         label="📥 Download Sample CSV",
-        data=csv_sample,
+        data=sample_csv_bytes(),
         file_name="sample_air_quality.csv",
         mime="text/csv",
         help="Download a sample CSV file to test the data analysis functionality"
@@ -201,31 +511,28 @@ if agent_choice == "Data Analyst":
     
     if uploaded_file is not None:
         try:
-            # Save uploaded file to temp directory
-            temp_dir = Path("tmp")
-            temp_dir.mkdir(exist_ok=True)
-            
-            temp_file_path = temp_dir / uploaded_file.name
-            
-            # Save the uploaded file
-            with open(temp_file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            
-            # Read and validate the file
-            df = pd.read_csv(temp_file_path, encoding='utf-8')
+            # Read only the first rows for validation and preview; the full parse happens on Run
+            # getvalue() hands back the upload's in-memory buffer without copying it
+            file_digest = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+            if st.session_state.get("uploaded_digest") != file_digest:
+                st.session_state["uploaded_preview"] = read_csv(uploaded_file, nrows=200)
+                st.session_state["uploaded_name"] = uploaded_file.name
+                st.session_state["uploaded_digest"] = file_digest
+                st.session_state["cols"] = st.session_state["uploaded_preview"].columns.tolist()
+            df = st.session_state["uploaded_preview"]
+            cols = st.session_state["cols"]
             
             if df.empty:
                 st.error("❌ The CSV file contains no data rows.")
             elif df.shape[1] == 0:
                 st.error("❌ The CSV file has no columns.")
             else:
-                st.success(f"✅ Successfully uploaded CSV with {df.shape[0]} rows and {df.shape[1]} columns")
-                st.info(f"📁 File saved as: {temp_file_path}")
+                st.success(f"✅ Successfully uploaded {uploaded_file.name} with {df.shape[1]} columns")
                 
                 # Show data preview
                 with st.expander("📋 Data Preview"):
                     st.dataframe(df.head())
-                    st.write(f"**Columns:** {', '.join(df.columns.tolist())}")
+                    st.write(f"**Columns:** {', '.join(cols)}")
                     
         except Exception as e:
             st.error(f"❌ Error processing CSV file: {e}")
@@ -245,11 +552,12 @@ if st.button("Run Research"):
                 # Special handling for Data Analyst with RAG
                 if agent_choice == "Data Analyst":
                     if uploaded_file is not None:
-                        # Read the uploaded file
-                        df = pd.read_csv(uploaded_file, encoding='utf-8')
-                        
-                        # Create comprehensive data analysis context
-                        data_context = create_data_analysis_context(df, topic)
+                        # Create comprehensive data analysis context; the dataset part is cached per file,
+                        # so editing the topic never re-parses the CSV or recomputes the statistics
+                        df_context = _df_context(
+                            uploaded_file, st.session_state["uploaded_digest"], st.session_state["cols"]
+                        )
+                        data_context = create_data_analysis_context(df_context, topic)
                         
                         # Run analysis with context
                         enhanced_topic = f"""
@@ -258,26 +566,28 @@ if st.button("Run Research"):
                         Please provide a comprehensive analysis of this data focusing on the user's request: {topic}
                         """
                         
-                        result = selected_agent.run(enhanced_topic)
+                        # Cached answers are only reused for the same file
+                        response_chunks = run_agent_cached(
+                            selected_agent, enhanced_topic, topic, f"{agent_choice}:{st.session_state['uploaded_digest']}"
+                        )
                     else:
                         st.error("❌ Please upload a CSV file first for data analysis.")
                         st.stop()
                 else:
                     # Regular agent execution
-                    result = selected_agent.run(topic)
+                    members = [get_agent(name) for name in TEAM_MEMBERS] if agent_choice == TEAM_CHOICE else ()
+                    response_chunks = run_agent_cached(selected_agent, topic, topic, agent_choice, members)
 
-                # Display clean markdown output
-                if result and hasattr(result, "content"):
-                    st.markdown(result.content)
-                else:
+                # Display clean markdown output as it streams in
+                content = st.write_stream(response_chunks)
+                if not content:
                     st.warning("No content returned from the agent.")
 
             except Exception as e:
                 st.error(f"Error: {e}")
                 # Provide more helpful error information
-                if "tool call validation failed" in str(e):
-                    st.info("💡 Tip: This might be a tool configuration issue. Try using a different agent.")
-                elif "rate limit" in str(e).lower():
-                    st.info("💡 Tip: Rate limit reached. Please wait a moment and try again.")
+                match = ERROR_TIP_PATTERN.search(str(e))
+                if match:
+                    st.info(ERROR_TIPS[match.group(1).lower()])
     else:
         st.warning("Please enter a topic first.")
\ No newline at end of file